@@ -32,11 +32,40 @@ class HindcastDatesTimes:
         self.years = years
 
     def __iter__(self):
+        mk = datetime.datetime
         for reference_date in self.reference_dates:
             year, month, day = reference_date.year, reference_date.month, reference_date.day
             if (month, day) == (2, 29):
                 day = 28
 
             for i in range(1, self.years + 1):
-                date = datetime.datetime(year - i, month, day)
-                yield (date, reference_date)
+                yield (mk(year - i, month, day), reference_date)
+
+    def as_array(self):
+        """Compute all the hindcast dates at once, using NumPy.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            Two arrays of ``datetime64[s]``, the hindcast dates and their matching reference dates,
+            in the same order as the iterator.
+        """
+        import numpy as np
+
+        reference_dates = list(self.reference_dates)
+        references = np.array(reference_dates, dtype="datetime64[s]")
+
+        year = np.array([d.year for d in reference_dates], dtype=np.int64)
+        month = np.array([d.month for d in reference_dates], dtype=np.int64)
+        day = np.array([d.day for d in reference_dates], dtype=np.int64)
+        day[(month == 2) & (day == 29)] = 28
+
+        offsets = np.arange(1, self.years + 1, dtype=np.int64)
+        year = (year[:, np.newaxis] - offsets).ravel()
+        month = np.repeat(month, self.years)
+        day = np.repeat(day, self.years)
+
+        months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+        dates = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+
+        return dates.astype("datetime64[s]"), np.repeat(references, self.years)
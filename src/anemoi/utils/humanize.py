@@ -11,13 +11,46 @@
 """Generate human readable strings"""
 
 import datetime
+import io
 import json
 import re
 import warnings
-from collections import defaultdict
+from functools import lru_cache
 
 from anemoi.utils.dates import as_datetime
 
+_WARNED = set()
+
+
+def _warn_once(name, replacement):
+    # Deprecated wrappers may sit on hot paths, so only warn the first time each one is used
+    if name in _WARNED:
+        return
+    _WARNED.add(name)
+    warnings.warn(
+        f"Function {name} is deprecated and will be removed in a future version. Use {replacement} instead.",
+        category=DeprecationWarning,
+        stacklevel=3,
+    )
+
+
+_BYTES_UNITS = ("", " KiB", " MiB", " GiB", " TiB", " PiB", " EiB", " ZiB", " YiB")
+_BASE2_UNITS = ("", "K", "M", "G", "T", " P", "E", "Z", "Y")
+
+
+def _round1(n):
+    # Round half up to one decimal, as round() rounds ties to even (e.g. 3.25 to 3.2)
+    return int(n * 10 + 0.5) / 10.0
+
+
+def _base2_scale(n, count):
+    # 1024 is 2**10, so the unit index can be read from the bit length
+    # of the integer part instead of dividing by 1024 in a loop
+    if n < 1024:
+        return n, 0
+    i = min((int(n).bit_length() - 1) // 10, count - 1)
+    return n / (1 << (10 * i)), i
+
 
 def bytes_to_human(n: float) -> str:
     """Convert a number of bytes to a human readable string
@@ -38,53 +71,46 @@ def bytes_to_human(n: float) -> str:
     str
         a human readable string
     """
+    if isinstance(n, int):
+        return _cached_bytes_to_human(n)
+    return _bytes_to_human(n)
 
-    """
-
-
-
-    """
 
+def _bytes_to_human(n):
     if n < 0:
         sign = "-"
-        n -= 0
+        n = -n
     else:
         sign = ""
 
-    u = ["", " KiB", " MiB", " GiB", " TiB", " PiB", " EiB", " ZiB", " YiB"]
-    i = 0
-    while n >= 1024:
-        n /= 1024.0
-        i += 1
-    return "%s%g%s" % (sign, int(n * 10 + 0.5) / 10.0, u[i])
+    n, i = _base2_scale(n, len(_BYTES_UNITS))
+    return f"{sign}{_round1(n):g}{_BYTES_UNITS[i]}"
+
+
+_cached_bytes_to_human = lru_cache(maxsize=1024)(_bytes_to_human)
 
 
 def bytes(n: float) -> str:
-    warnings.warn(
-        "Function bytes is deprecated and will be removed in a future version. Use bytes_to_human instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("bytes", "bytes_to_human")
     return bytes_to_human(n)
 
 
 def base2_to_human(n) -> str:
+    if isinstance(n, int):
+        return _cached_base2_to_human(n)
+    return _base2_to_human(n)
 
-    u = ["", "K", "M", "G", "T", " P", "E", "Z", "Y"]
-    i = 0
-    while n >= 1024:
-        n /= 1024.0
-        i += 1
-    return "%g%s" % (int(n * 10 + 0.5) / 10.0, u[i])
 
+def _base2_to_human(n):
+    n, i = _base2_scale(n, len(_BASE2_UNITS))
+    return f"{_round1(n):g}{_BASE2_UNITS[i]}"
 
-def base2(n) -> str:
 
-    warnings.warn(
-        "Function base2 is deprecated and will be removed in a future version. Use base2_to_human instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+_cached_base2_to_human = lru_cache(maxsize=1024)(_base2_to_human)
+
+
+def base2(n) -> str:
+    _warn_once("base2", "base2_to_human")
     return base2_to_human(n)
 
 
@@ -97,13 +123,6 @@ PERIODS = (
 )
 
 
-def _plural(count):
-    if count != 1:
-        return "s"
-    else:
-        return ""
-
-
 def seconds_to_human(seconds: float) -> str:
     """Convert a number of seconds to a human readable string
 
@@ -123,7 +142,16 @@ def seconds_to_human(seconds: float) -> str:
     """
     if isinstance(seconds, datetime.timedelta):
         seconds = seconds.total_seconds()
+        if seconds.is_integer():
+            seconds = int(seconds)
+
+    # Only integer values are cached, floats rarely repeat exactly
+    if isinstance(seconds, int):
+        return _cached_seconds_to_human(seconds)
+    return _seconds_to_human(seconds)
 
+
+def _seconds_to_human(seconds):
     if seconds == 0:
         return "instantaneous"
 
@@ -147,35 +175,37 @@ def seconds_to_human(seconds: float) -> str:
             seconds /= 1000
             i -= 1
         seconds = round(seconds * 10) / 10
-        return f"{seconds:g} {units[i]}second{_plural(seconds)}"
+        return f"{seconds:g} {units[i]}second{'' if seconds == 1 else 's'}"
 
     n = seconds
     s = []
     for p in PERIODS:
         m = int(n / p[0])
         if m:
-            s.append("%d %s%s" % (m, p[1], _plural(m)))
+            s.append(f"{m} {p[1]}{'' if m == 1 else 's'}")
             n %= p[0]
 
     if not s:
         seconds = round(seconds * 10) / 10
-        s.append("%g second%s" % (seconds, _plural(seconds)))
+        s.append(f"{seconds:g} second{'' if seconds == 1 else 's'}")
     return " ".join(s)
 
 
+_cached_seconds_to_human = lru_cache(maxsize=1024)(_seconds_to_human)
+
+
 def seconds(seconds: float) -> str:
-    warnings.warn(
-        "Function seconds is deprecated and will be removed in a future version. Use seconds_to_human instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("seconds", "seconds_to_human")
     return seconds_to_human(seconds)
 
 
 def plural(value, what):
-    return f"{value:,} {what}{_plural(value)}"
+    return f"{value:,} {what}{'' if value == 1 else 's'}"
 
 
+_datetime = datetime.datetime
+_UTC = datetime.timezone.utc
+
 DOW = [
     "Monday",
     "Tuesday",
@@ -202,20 +232,13 @@ MONTH = [
 ]
 
 
-def __(n):
-    if n in (11, 12, 13):
-        return "th"
-
-    if n % 10 == 1:
-        return "st"
-
-    if n % 10 == 2:
-        return "nd"
+_ORDINAL_SUFFIX = tuple(
+    "th" if 10 <= i % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(i % 10, "th") for i in range(100)
+)
 
-    if n % 10 == 3:
-        return "rd"
 
-    return "th"
+def __(n):
+    return _ORDINAL_SUFFIX[n % 100]
 
 
 def when(then, now=None, short=True, use_utc=False) -> str:
@@ -256,117 +279,171 @@ def when(then, now=None, short=True, use_utc=False) -> str:
     last = "last"
 
     if now is None:
-        if use_utc:
-            now = datetime.datetime.utcnow()
-        else:
-            now = datetime.datetime.now()
+        now = _datetime.now(_UTC).replace(tzinfo=None) if use_utc else _datetime.now()
 
-    diff = (now - then).total_seconds()
+    diff = int((now - then).total_seconds())
 
     if diff < 0:
         last = "next"
         diff = -diff
 
-    diff = int(diff)
-
     if diff == 0:
         return "right now"
 
     def _(x):
         if last == "last":
-            return "%s ago" % (x,)
+            return f"{x} ago"
         else:
-            return "in %s" % (x,)
+            return f"in {x}"
 
     if diff < 60:
         diff = int(diff + 0.5)
-        return _("%s second%s" % (diff, _plural(diff)))
+        return _(f"{diff} second{'' if diff == 1 else 's'}")
 
     if diff < 60 * 60:
         diff /= 60
         diff = int(diff + 0.5)
-        return _("%s minute%s" % (diff, _plural(diff)))
+        return _(f"{diff} minute{'' if diff == 1 else 's'}")
 
     if diff < 60 * 60 * 6:
         diff /= 60 * 60
         diff = int(diff + 0.5)
-        return _("%s hour%s" % (diff, _plural(diff)))
+        return _(f"{diff} hour{'' if diff == 1 else 's'}")
 
+    # Only needed past this point, so not computed for the recent cases above
     jnow = now.toordinal()
     jthen = then.toordinal()
+    days = abs(jnow - jthen)
+    then_day, then_month, then_year, then_weekday = then.day, then.month, then.year, then.weekday()
 
     if jnow == jthen:
-        return "today at %02d:%02d" % (then.hour, then.minute)
+        return f"today at {then.hour:02d}:{then.minute:02d}"
 
     if jnow == jthen + 1:
-        return "yesterday at %02d:%02d" % (then.hour, then.minute)
+        return f"yesterday at {then.hour:02d}:{then.minute:02d}"
 
     if jnow == jthen - 1:
-        return "tomorrow at %02d:%02d" % (then.hour, then.minute)
+        return f"tomorrow at {then.hour:02d}:{then.minute:02d}"
 
-    if abs(jnow - jthen) <= 7:
+    if days <= 7:
         if last == "next":
             last = "this"
-        return "%s %s" % (
-            last,
-            DOW[then.weekday()],
-        )
+        return f"{last} {DOW[then_weekday]}"
 
-    if abs(jnow - jthen) < 32 and now.month == then.month:
-        return "the %d%s of this month" % (then.day, __(then.day))
+    if days < 32 and now.month == then_month:
+        return f"the {then_day}{__(then_day)} of this month"
 
-    if abs(jnow - jthen) < 64 and now.month == then.month + 1:
-        return "the %d%s of %s month" % (then.day, __(then.day), last)
+    if days < 64 and now.month == then_month + 1:
+        return f"the {then_day}{__(then_day)} of {last} month"
 
     if short:
-        years = int(abs(jnow - jthen) / 365.25 + 0.5)
+        years = int(days / 365.25 + 0.5)
         if years == 1:
-            return "%s year" % last
+            return f"{last} year"
 
         if years > 1:
-            return _("%d years" % (years,))
+            return _(f"{years} years")
 
-        month = then.month
-        if now.year != then.year:
+        month = then_month
+        if now.year != then_year:
             month -= 12
 
         d = abs(now.month - month)
         if d >= 12:
             return _("a year")
         else:
-            return _("%d month%s" % (d, _plural(d)))
-
-    return "on %s %d %s %d" % (
-        DOW[then.weekday()],
-        then.day,
-        MONTH[then.month],
-        then.year,
-    )
+            return _(f"{d} month{'' if d == 1 else 's'}")
 
+    return f"on {DOW[then_weekday]} {then_day} {MONTH[then_month - 1]} {then_year}"
 
-def string_distance(s, t):
-    import numpy as np
 
-    m = len(s)
+def _myers_distance(s, t, max_distance=None):
+    # Myers' bit-parallel edit distance: each column of the DP matrix is
+    # encoded as bit vectors of vertical deltas, one bit per character of t
     n = len(t)
-    d = np.zeros((m + 1, n + 1), dtype=int)
+    if n == 0:
+        return len(s)
+
+    # The score changes by at most one per character of s
+    remaining = len(s)
+
+    peq = {}
+    for i, c in enumerate(t):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << n) - 1
+    last = 1 << (n - 1)
+    pv = mask
+    mv = 0
+    score = n
+
+    for c in s:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+        remaining -= 1
+        if max_distance is not None and score - remaining > max_distance:
+            return max_distance + 1
+
+    return score
+
+
+def string_distance(s, t, max_distance=None):
+    """Compute the Levenshtein distance between two strings
 
-    one = int(1)
-    zero = int(0)
+    Parameters
+    ----------
+    s : str
+        The first string
+    t : str
+        The second string
+    max_distance : int, optional
+        If given, stop as soon as the distance is known to exceed this value and
+        return ``max_distance + 1``, by default None
+
+    Returns
+    -------
+    int
+        The edit distance between the two strings
+    """
+    if max_distance is not None and abs(len(s) - len(t)) > max_distance:
+        return max_distance + 1
 
-    d[:, 0] = np.arange(m + 1)
-    d[0, :] = np.arange(n + 1)
+    try:
+        # Python integers are unbounded, so the bit vectors work for strings of any length
+        return _myers_distance(s, t, max_distance)
+    except TypeError:
+        # Sequences of unhashable items
+        pass
+
+    # Only keep two rows of the DP matrix, as plain lists
+    m = len(s)
+    n = len(t)
+    prev = list(range(n + 1))
+    curr = [0] * (n + 1)
 
     for i in range(1, m + 1):
+        curr[0] = i
+        si = s[i - 1]
         for j in range(1, n + 1):
-            cost = zero if s[i - 1] == t[j - 1] else one
-            d[i, j] = min(
-                d[i - 1, j] + one,
-                d[i, j - 1] + one,
-                d[i - 1, j - 1] + cost,
-            )
+            cost = 0 if si == t[j - 1] else 1
+            curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+        if max_distance is not None and min(curr) > max_distance:
+            return max_distance + 1
+        prev, curr = curr, prev
 
-    return d[m, n]
+    return prev[n]
 
 
 def did_you_mean(word, vocabulary) -> str:
@@ -387,7 +464,27 @@ def did_you_mean(word, vocabulary) -> str:
     str
         The closest word in the vocabulary
     """
-    _, best = min((string_distance(word, w), w) for w in vocabulary)
+    # Usually called repeatedly with the same vocabulary, so cache on a hashable copy
+    return _did_you_mean(word, tuple(vocabulary))
+
+
+@lru_cache(maxsize=256)
+def _did_you_mean(word, vocabulary):
+    # Try the words closest in length first, so that the best distance
+    # found so far can be used to skip or cut short the others
+    vocabulary = sorted(vocabulary, key=lambda w: abs(len(w) - len(word)))
+    if not vocabulary:
+        raise ValueError("did_you_mean() requires a non-empty vocabulary")
+
+    best = vocabulary[0]
+    best_distance = string_distance(word, best)
+    for w in vocabulary[1:]:
+        if abs(len(w) - len(word)) > best_distance:
+            break
+        distance = string_distance(word, w, max_distance=best_distance)
+        if (distance, w) < (best_distance, best):
+            best_distance, best = distance, w
+
     # if distance < min(len(word), len(best)):
     return best
 
@@ -419,10 +516,16 @@ def list_to_human(lst, conjunction="and") -> str:
     if not lst:
         return "??"
 
-    if len(lst) > 2:
-        lst = [", ".join(lst[:-1]), lst[-1]]
+    if len(lst) == 1:
+        return lst[0]
+
+    if len(lst) == 2:
+        return f"{lst[0]} {conjunction} {lst[1]}"
+
+    return f"{', '.join(lst[:-1])} {conjunction} {lst[-1]}"
+
 
-    return f" {conjunction} ".join(lst)
+_NUMBER_UNIT_RE = re.compile(r"^\s*(\d+)\s*([%\w]+)?\s*$")
 
 
 def human_to_number(value, name, units, none_ok):
@@ -431,7 +534,7 @@ def human_to_number(value, name, units, none_ok):
 
     value = str(value)
     # TODO: support floats
-    m = re.search(r"^\s*(\d+)\s*([%\w]+)?\s*$", value)
+    m = _NUMBER_UNIT_RE.search(value)
     if m is None:
         raise ValueError(f"{name}: invalid number/unit {value}")
     value = int(m.group(1))
@@ -445,104 +548,102 @@ def human_to_number(value, name, units, none_ok):
 
 
 def as_number(value, name=None, units=None, none_ok=False):
-    warnings.warn(
-        "Function as_number is deprecated and will be removed in a future version. Use human_to_number instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("as_number", "human_to_number")
     return human_to_number(value, name, units, none_ok)
 
 
+@lru_cache(maxsize=1024)
+def _cached_human_to_number(text, name, kind):
+    # Keyed on the text of the value, which is all that human_to_number looks at,
+    # so that unhashable values are rejected with the usual ValueError
+    return human_to_number(text, name, _HUMAN_UNITS[kind], False)
+
+
+def _human_to_number(value, name, kind, none_ok):
+    if value is None and none_ok:
+        return None
+    return _cached_human_to_number(str(value), name, kind)
+
+
+_SECONDS_UNITS = dict(s=1, m=60, h=3600, d=86400, w=86400 * 7)
+
+
 def human_seconds(value, name=None, none_ok=False):
-    units = dict(s=1, m=60, h=3600, d=86400, w=86400 * 7)
-    return human_to_number(value, name, units, none_ok)
+    return _human_to_number(value, name, "seconds", none_ok)
 
 
 def as_seconds(value, name=None, none_ok=False):
-    warnings.warn(
-        "Function as_seconds is deprecated and will be removed in a future version. Use human_seconds instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("as_seconds", "human_seconds")
     return human_seconds(value, name, none_ok)
 
 
+_PERCENT_UNITS = {"%": 1}
+
+
 def human_to_percent(value, name=None, none_ok=False):
-    units = {"%": 1}
-    return human_to_number(value, name, units, none_ok)
+    return _human_to_number(value, name, "percent", none_ok)
 
 
 def as_percent(value, name=None, none_ok=False):
-    warnings.warn(
-        "Function as_percent is deprecated and will be removed in a future version. Use human_to_percent instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("as_percent", "human_to_percent")
     return human_to_percent(value, name, none_ok)
 
 
-def human_to_bytes(value, name=None, none_ok=False):
-    units = {}
-    n = 1
-    for u in "KMGTP":
-        n *= 1024
-        units[u] = n
-        units[u.lower()] = n
+_BYTE_UNITS = {u: 1024**i for i, unit in enumerate("KMGTP", start=1) for u in (unit, unit.lower())}
 
-    return human_to_number(value, name, units, none_ok)
+
+def human_to_bytes(value, name=None, none_ok=False):
+    return _human_to_number(value, name, "bytes", none_ok)
 
 
 def as_bytes(value, name=None, none_ok=False):
-    warnings.warn(
-        "Function as_bytes is deprecated and will be removed in a future version. Use human_to_bytes instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("as_bytes", "human_to_bytes")
     return human_to_bytes(value, name, none_ok)
 
 
+_HUMAN_UNITS = dict(seconds=_SECONDS_UNITS, percent=_PERCENT_UNITS, bytes=_BYTE_UNITS)
+
+
+_TIMEDELTA_UNITS = {"w": "weeks", "d": "days", "h": "hours", "m": "minutes", "s": "seconds"}
+
+
 def human_to_timedelta(value, name=None, none_ok=False):
     if value is None and none_ok:
         return None
 
-    save = value
-    value = re.sub(r"[^a-zA-Z0-9]", "", value.lower())
-    value = re.sub(r"([a-zA-Z])[a-zA-Z]*", r"\1", value)
-    # value = re.sub(r"[^dmhsw0-9]", "", value)
-    bits = [b for b in re.split(r"([dmhsw])", value) if b != ""]
-
-    times = defaultdict(int)
+    def _invalid():
+        if name:
+            return ValueError(f"{name}: invalid period '{value}'")
+        return ValueError(f"Invalid period '{value}'")
 
+    times = {}
     val = None
-
-    for i, n in enumerate(bits):
-        if i % 2 == 0:
-            val = int(n)
-        else:
-            assert n in ("d", "m", "h", "s", "w")
-            times[n] = val
+    in_word = False
+
+    # Single pass over the string: digits accumulate a value, the first letter
+    # of a word selects the unit and the rest of the word is ignored, as is
+    # anything that is neither an ASCII letter nor a digit.
+    for c in value.lower():
+        if "0" <= c <= "9":
+            val = (val or 0) * 10 + int(c)
+            in_word = False
+        elif "a" <= c <= "z":
+            if in_word:
+                continue
+            in_word = True
+            if val is None or c not in _TIMEDELTA_UNITS:
+                raise _invalid()
+            times[_TIMEDELTA_UNITS[c]] = val
             val = None
 
     if val is not None:
-        if name:
-            raise ValueError(f"{name}: invalid period '{save}'")
-        raise ValueError(f"Invalid period '{save}'")
-
-    return datetime.timedelta(
-        weeks=times["w"],
-        days=times["d"],
-        hours=times["h"],
-        minutes=times["m"],
-        seconds=times["s"],
-    )
+        raise _invalid()
+
+    return datetime.timedelta(**times)
 
 
 def as_timedelta(value, name=None, none_ok=False):
-    warnings.warn(
-        "Function as_timedelta is deprecated and will be removed in a future version. Use human_to_timedelta instead.",
-        category=DeprecationWarning,
-        stacklevel=2,
-    )
+    _warn_once("as_timedelta", "human_to_timedelta")
     return human_to_timedelta(value, name, none_ok)
 
 
@@ -571,42 +672,66 @@ def json_pretty_dump(obj, max_line_length=120, default=str) -> str:
         JSON string.
     """
 
-    def _format_json(obj, indent_level=0):
-        """Helper function to format JSON objects with custom pretty-print rules.
-
-        Parameters
-        ----------
-        obj : Any
-            The object to format.
-        indent_level : int, optional
-            Current indentation level. Default is 0.
-
-        Returns
-        -------
-        str
-            Formatted JSON string.
-        """
+    def _container(opening, items, closing, indent_level):
+        line = opening + ", ".join(items) + closing
+        if len(line) <= max_line_length:
+            return line
+        return _multiline(opening, items, closing, indent_level)
+
+    def _multiline(opening, items, closing, indent_level):
         indent = " " * 4 * indent_level
-        if isinstance(obj, dict):
-            items = []
-            for key, value in obj.items():
-                items.append(f'"{key}": {_format_json(value, indent_level + 1)}')
-            line = "{" + ", ".join(items) + "}"
-            if len(line) <= max_line_length:
-                return line
-            else:
-                return "{\n" + ",\n".join([f"{indent}    {item}" for item in items]) + "\n" + indent + "}"
-        elif isinstance(obj, list):
-            items = [_format_json(item, indent_level + 1) for item in obj]
-            line = "[" + ", ".join(items) + "]"
-            if len(line) <= max_line_length:
-                return line
+        item_indent = indent + "    "
+
+        out = io.StringIO()
+        out.write(opening)
+        out.write("\n")
+        separator = ""
+        for item in items:
+            out.write(separator)
+            out.write(item_indent)
+            out.write(item)
+            separator = ",\n"
+        out.write("\n")
+        out.write(indent)
+        out.write(closing)
+        return out.getvalue()
+
+    # Post-order traversal with an explicit stack, rather than recursion: children
+    # are formatted first, and their strings are collected on `done` until the
+    # enclosing container is assembled.
+    VISIT, DICT, LIST = 0, 1, 2
+
+    stack = [(VISIT, obj, 0)]
+    done = []
+
+    while stack:
+        action, value, indent_level = stack.pop()
+
+        if action == VISIT:
+            if isinstance(value, dict):
+                stack.append((DICT, list(value.keys()), indent_level))
+                for v in reversed(list(value.values())):
+                    stack.append((VISIT, v, indent_level + 1))
+            elif isinstance(value, list):
+                stack.append((LIST, len(value), indent_level))
+                for v in reversed(value):
+                    stack.append((VISIT, v, indent_level + 1))
             else:
-                return "[\n" + ",\n".join([f"{indent}    {item}" for item in items]) + "\n" + indent + "]"
+                done.append(json.dumps(value, default=default))
+            continue
+
+        count = len(value) if action == DICT else value
+        start = len(done) - count
+        items = done[start:]
+        del done[start:]
+
+        if action == DICT:
+            items = [f'"{key}": {item}' for key, item in zip(value, items)]
+            done.append(_container("{", items, "}", indent_level))
         else:
-            return json.dumps(obj, default=default)
+            done.append(_container("[", items, "]", indent_level))
 
-    return _format_json(obj)
+    return done[0]
 
 
 def shorten_list(lst, max_length=5) -> list:
@@ -624,34 +749,34 @@ def shorten_list(lst, max_length=5) -> list:
     list
         Shortened list.
     """
-    if len(lst) <= max_length:
+    n = len(lst)
+    if n <= max_length:
         return lst
-    else:
-        half = max_length // 2
-        result = list(lst[:half]) + ["..."] + list(lst[max_length - half :])
-        if isinstance(lst, tuple):
-            return tuple(result)
-        return result
+
+    half = max_length // 2
+    if isinstance(lst, tuple):
+        return lst[:half] + ("...",) + lst[n - half :]
+    if isinstance(lst, list):
+        return lst[:half] + ["..."] + lst[n - half :]
+    return list(lst[:half]) + ["..."] + list(lst[n - half :])
 
 
 def _compress_dates(dates):
     dates = sorted(dates)
-    if len(dates) < 3:
-        yield dates
-        return
+    n = len(dates)
+    i = 0
 
-    prev = first = dates.pop(0)
-    curr = dates.pop(0)
-    delta = curr - prev
-    while curr - prev == delta:
-        prev = curr
-        if not dates:
-            break
-        curr = dates.pop(0)
+    while n - i >= 3:
+        first = dates[i]
+        delta = dates[i + 1] - first
+        i += 1
+        while i + 1 < n and dates[i + 1] - dates[i] == delta:
+            i += 1
+        yield (first, dates[i], delta)
+        i += 1
 
-    yield (first, prev, delta)
-    if dates:
-        yield from _compress_dates([curr] + dates)
+    if i < n:
+        yield dates[i:]
 
 
 def compress_dates(dates) -> str:
@@ -668,7 +793,8 @@ def compress_dates(dates) -> str:
         A human-readable string representing the compressed dates.
     """
 
-    dates = [as_datetime(_) for _ in dates]
+    # as_datetime() is only needed for strings, dates and timezone-aware datetimes
+    dates = [d if isinstance(d, datetime.datetime) and d.tzinfo is None else as_datetime(d) for d in dates]
     result = []
 
     for n in _compress_dates(dates):
@@ -691,6 +817,36 @@ def print_dates(dates) -> None:
     print(compress_dates(dates))
 
 
+def _range_from_bits(bits):
+    if len(bits) == 3 and bits[1].lower() == "to":
+        return range(int(bits[0]), int(bits[2]) + 1)
+
+    if len(bits) == 5 and bits[1].lower() == "to" and bits[3].lower() == "by":
+        start, stop, step = int(bits[0]), int(bits[2]), int(bits[4])
+        return range(start, stop + step, step)
+
+    return None
+
+
+def make_range_int(value) -> range:
+    """Convert a string like "1/to/3" or "1/to/10/by/2" to a range of integers, without building a list.
+
+    Parameters
+    ----------
+    value : str
+        The value to convert to a range of integers.
+
+    Returns
+    -------
+    range
+        A range of integers.
+    """
+    result = _range_from_bits(value.split("/")) if isinstance(value, str) else None
+    if result is None:
+        raise ValueError(f"Cannot make range from {value}")
+    return result
+
+
 def make_list_int(value) -> list:
     """Convert a string like "1/2/3" or "1/to/3" or "1/to/10/by/2" to a list of integers.
 
@@ -708,11 +864,10 @@ def make_list_int(value) -> list:
         if "/" not in value:
             return [int(value)]
         bits = value.split("/")
-        if len(bits) == 3 and bits[1].lower() == "to":
-            value = list(range(int(bits[0]), int(bits[2]) + 1, 1))
-
-        elif len(bits) == 5 and bits[1].lower() == "to" and bits[3].lower() == "by":
-            value = list(range(int(bits[0]), int(bits[2]) + int(bits[4]), int(bits[4])))
+        result = _range_from_bits(bits)
+        if result is not None:
+            return list(result)
+        return [int(b) for b in bits]
 
     if isinstance(value, list):
         return value
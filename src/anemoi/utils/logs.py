@@ -10,31 +10,49 @@
 
 """Logging utilities."""
 
+import contextvars
 import logging
-import threading
 
-thread_local = threading.local()
+# ContextVar.get() is implemented in C and is cheaper than a threading.local
+# attribute lookup; each thread (and asyncio task) sees its own value
+_logging_name = contextvars.ContextVar("logging_name", default="main")
 
 
 LOGGER = logging.getLogger(__name__)
 
 
 def set_logging_name(name):
-    thread_local.logging_name = name
+    _logging_name.set(name)
 
 
 class ThreadCustomFormatter(logging.Formatter):
     def format(self, record):
-        record.logging_name = thread_local.logging_name
+        # The same record may be formatted by several handlers
+        if not hasattr(record, "logging_name"):
+            record.logging_name = _logging_name.get()
         return super().format(record)
 
 
+class LoggingNameFilter(logging.Filter):
+    """Add the current logging name to records, for use with a plain logging.Formatter"""
+
+    def filter(self, record):
+        record.logging_name = _logging_name.get()
+        return True
+
+
+_LOGGING_NAME_FILTER = LoggingNameFilter()
+
+
 def enable_logging_name(name="main"):
-    thread_local.logging_name = name
+    _logging_name.set(name)
 
-    formatter = ThreadCustomFormatter("%(asctime)s - %(logging_name)s - %(levelname)s - %(message)s")
+    formatter = logging.Formatter("%(asctime)s - %(logging_name)s - %(levelname)s - %(message)s")
 
     logger = logging.getLogger()
 
+    # Filters are attached to the handlers, not the logger, as logger filters
+    # are not applied to records propagated from child loggers
     for handler in logger.handlers:
+        handler.addFilter(_LOGGING_NAME_FILTER)
         handler.setFormatter(formatter)
@@ -17,6 +17,8 @@ Has some konwledge of how certain streams are organised in Mars.
 import datetime
 import logging
 import os
+import threading
+from functools import lru_cache
 
 import yaml
 
@@ -47,16 +49,15 @@ def _expand_mars_labelling(request):
 
 
 STREAMS = None
+STREAMS_LOCK = threading.Lock()
 
 
-def _lookup_mars_stream(request):
-    global STREAMS
-
-    if STREAMS is None:
+def _load_streams():
+    with open(os.path.join(os.path.dirname(__file__), "mars.yaml")) as f:
+        return yaml.safe_load(f)
 
-        with open(os.path.join(os.path.dirname(__file__), "mars.yaml")) as f:
-            STREAMS = yaml.safe_load(f)
 
+def _match_mars_stream(request):
     request = _expand_mars_labelling(request)
     for s in STREAMS:
         match = s["match"]
@@ -64,6 +65,28 @@ def _lookup_mars_stream(request):
             return s["info"]
 
 
+@lru_cache(maxsize=256)
+def _cached_match_mars_stream(items):
+    return _match_mars_stream(dict(items))
+
+
+def _lookup_mars_stream(request):
+    global STREAMS
+
+    # Double-checked, so that the lock is only taken until the rules are loaded
+    if STREAMS is None:
+        with STREAMS_LOCK:
+            if STREAMS is None:
+                STREAMS = _load_streams()
+
+    # The rules never change once loaded, so results can be cached for the lifetime of the process
+    try:
+        return _cached_match_mars_stream(frozenset(request.items()))
+    except TypeError:
+        # Requests with unhashable values (e.g. lists) are not cached
+        return _match_mars_stream(request)
+
+
 def recenter(date, center, members):
 
     center = _lookup_mars_stream(center)
@@ -13,10 +13,7 @@ def print_request(verb, request, file=sys.stdout):
     for k, v in request.items():
         if not isinstance(v, (list, tuple, set)):
             v = [v]
-        v = [str(_) for _ in v]
-        v = "/".join(v)
+        v = "/".join(map(str, v))
         r.append(f"{k}={v}")
 
-    r = ",\n   ".join(r)
-    print(r, file=file)
-    print(file=file)
+    file.write(",\n   ".join(r) + "\n\n")
@@ -17,77 +17,149 @@
 
 """
 
-import datetime
-import json
 import logging
 import os
-import subprocess
 import sys
-import sysconfig
 from functools import cache
 
 LOG = logging.getLogger(__name__)
 
 
-def lookup_git_repo(path):
+@cache
+def _git_root_in_dir(path):
+    # Cached per directory, so that modules sharing ancestors do not look for the same
+    # (or the same missing) repository again. Only the path is cached, as Repo objects
+    # are not thread-safe and must not be shared between callers
     from git import InvalidGitRepositoryError
     from git import Repo
 
-    while path != "/":
-        try:
-            return Repo(path)
-        except InvalidGitRepositoryError:
-            path = os.path.dirname(path)
+    if path == "/" or path == os.path.dirname(path):
+        return None
+
+    try:
+        with Repo(path):
+            return path
+    except InvalidGitRepositoryError:
+        return _git_root_in_dir(os.path.dirname(path))
+
+
+def _git_root(path):
+    if not os.path.isdir(path):
+        path = os.path.dirname(path)
+    return _git_root_in_dir(path)
+
+
+def lookup_git_repo(path):
+    from git import Repo
+
+    root = _git_root(path)
+    if root is None:
+        return None
+    return Repo(root)
+
+
+def _git_status(repo):
+    """Return the modified and untracked files of a repository, using a single ``git status``.
+
+    This replaces ``repo.index.diff(None)`` and ``repo.untracked_files``, which each run
+    their own ``git`` subprocess.
+    """
+    modified = []
+    untracked = []
+
+    entries = iter(repo.git.status("--porcelain", "-z", "--untracked-files").split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+
+        x, y, path = entry[0], entry[1], entry[3:]
+
+        if x in "RC" or y in "RC":
+            # Renames and copies, in the index or the worktree, are followed by the original path
+            original = next(entries, None)
+            if y in "RC":
+                # Reported under the original path, like the a_path of index.diff(None)
+                path = original
+
+        if x == "?":
+            untracked.append(path)
+        elif y not in " !":
+            modified.append(path)
+
+    return modified, untracked
+
+
+def _probe_git(repo, full):
+    modified_files, untracked_files = _git_status(repo)
+
+    if not full:
+        return dict(
+            sha1=repo.head.commit.hexsha,
+            modified_files=len(modified_files),
+            untracked_files=len(untracked_files),
+        )
 
-    return None
+    return dict(
+        sha1=repo.head.commit.hexsha,
+        remotes=[r.url for r in repo.remotes],
+        modified_files=sorted(modified_files),
+        untracked_files=sorted(untracked_files),
+    )
 
 
 def _check_for_git(paths, full):
-    versions = {}
+    import concurrent.futures
+
+    roots = {}
     for name, path in paths:
-        repo = lookup_git_repo(path)
-        if repo is None:
-            continue
+        root = _git_root(path)
+        if root is not None:
+            roots[(name, path)] = root
 
-        try:
+    if not roots:
+        return {}
+
+    # Modules from the same repository share a single probe, and repositories are probed concurrently
+    unique = list(dict.fromkeys(roots.values()))
 
-            if not full:
-                versions[name] = dict(
-                    git=dict(
-                        sha1=repo.head.commit.hexsha,
-                        modified_files=len([item.a_path for item in repo.index.diff(None)]),
-                        untracked_files=len(repo.untracked_files),
-                    ),
-                )
-                continue
-
-            versions[name] = dict(
-                path=path,
-                git=dict(
-                    sha1=repo.head.commit.hexsha,
-                    remotes=[r.url for r in repo.remotes],
-                    modified_files=sorted([item.a_path for item in repo.index.diff(None)]),
-                    untracked_files=sorted(repo.untracked_files),
-                ),
-            )
+    def _probe(root):
+        from git import Repo
 
+        try:
+            with Repo(root) as repo:
+                return _probe_git(repo, full)
         except ValueError as e:
-            LOG.error(f"Error checking git repo {path}: {e}")
+            return e
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(unique))) as executor:
+        probes = dict(zip(unique, executor.map(_probe, unique)))
+
+    versions = {}
+    for (name, path), root in roots.items():
+        git = probes[root]
+
+        if isinstance(git, ValueError):
+            LOG.error(f"Error checking git repo {path}: {git}")
+            continue
+
+        if full:
+            versions[name] = dict(path=path, git=dict(git))
+        else:
+            versions[name] = dict(git=dict(git))
 
     return versions
 
 
 def version(versions, name, module, roots, namespaces, paths, full):
-    path = None
+    path = getattr(module, "__file__", None)
+    if path is not None:
+        for root, tag in roots:
+            if path.startswith(root):
+                path = tag + path[len(root) :]
+                break
 
-    if hasattr(module, "__file__"):
-        path = module.__file__
-        if path is not None:
-            for k, v in roots.items():
-                path = path.replace(k, f"<{v}>")
-
-            if path.startswith("/"):
-                paths.add((name, path))
+        if path.startswith("/"):
+            paths.add((name, path))
 
     try:
         versions[name] = str(module.__version__)
@@ -119,30 +191,53 @@ def version(versions, name, module, roots, namespaces, paths, full):
     versions[name] = str(module)
 
 
-def _module_versions(full):
+@cache
+def _sysconfig_paths():
+    import sysconfig
+
+    return sysconfig.get_paths()
+
+
+@cache
+def _sysconfig_roots():
     # https://docs.python.org/3/library/sysconfig.html
 
     roots = {}
-    for name, path in sysconfig.get_paths().items():
+    for name, path in _sysconfig_paths().items():
         path = os.path.realpath(path)
         if path not in roots:
             roots[path] = name
 
-    # Sort by length of path, so that we get the most specific first
-    roots = {path: name for path, name in sorted(roots.items(), key=lambda x: len(x[0]), reverse=True)}
+    # Sort by length of path, so that we get the most specific first. The roots are
+    # matched as prefixes, so the separator is included to only match whole directories
+    return tuple(
+        (os.path.join(path, ""), os.path.join(f"<{name}>", ""))
+        for path, name in sorted(roots.items(), key=lambda x: len(x[0]), reverse=True)
+    )
+
+
+def _module_versions(full):
+    roots = _sysconfig_roots()
 
     paths = set()
 
     versions = {}
     namespaces = set()
-    for k, v in sorted(sys.modules.items()):
+
+    # Sort a single snapshot of sys.modules, so that the output stays in a stable order
+    top, nested = [], []
+    for k, v in sorted(sys.modules.copy().items()):
         if "." not in k:
-            version(versions, k, v, roots, namespaces, paths, full)
+            top.append((k, v))
+        elif k.count(".") == 1:
+            nested.append((k, v))
+
+    for k, v in top:
+        version(versions, k, v, roots, namespaces, paths, full)
 
     # Catter for modules like "earthkit.meteo"
-    for k, v in sorted(sys.modules.items()):
-        bits = k.split(".")
-        if len(bits) == 2 and bits[0] in namespaces:
+    for k, v in nested:
+        if k.split(".", 1)[0] in namespaces:
             version(versions, k, v, roots, namespaces, paths, full)
 
     return versions, paths
@@ -165,16 +260,17 @@ def import_name_to_distribution_name(packages: list):
     distribution_names = {}
     package_distribution_names = package_distributions()
 
-    for package in [p for p in packages if p in package_distribution_names]:
-        distr_name = package_distribution_names[package]
-        if isinstance(distr_name, list):
-            if len(distr_name) > 1:
-                # Multiple distributions for the same package, i.e. anemoi-graphs, anemoi-utils, ..., Don't know how to handle this
-                continue
-            distr_name = distr_name[0]
+    for package in packages:
+        distr_names = package_distribution_names.get(package)
+        if distr_names is None:
+            continue
 
-        if distr_name != package:
-            distribution_names[package] = distr_name
+        if len(distr_names) > 1:
+            # Multiple distributions for the same package, i.e. anemoi-graphs, anemoi-utils, ..., Don't know how to handle this
+            continue
+
+        if distr_names[0] != package:
+            distribution_names[package] = distr_names[0]
 
     return distribution_names
 
@@ -213,21 +309,21 @@ def _paths(path_or_object):
             return _paths(module)
         return [(path_or_object, path_or_object)]
 
-    if hasattr(path_or_object, "__module__"):
-        module = sys.modules.get(path_or_object.__module__)
-        return [(path_or_object.__module__, module.__file__)]
+    module_name = getattr(path_or_object, "__module__", None)
+    if module_name is not None:
+        module = sys.modules.get(module_name)
+        return [(module_name, module.__file__)]
 
     name = _name(path_or_object)
     paths = []
-    if hasattr(path_or_object, "__file__"):
-        paths.append((name, path_or_object.__file__))
 
-    if hasattr(path_or_object, "__code__"):
-        paths.append((name, path_or_object.__code__.co_filename))
+    file = getattr(path_or_object, "__file__", None)
+    if file is not None:
+        paths.append((name, file))
 
-    if hasattr(path_or_object, "__module__"):
-        module = sys.modules.get(path_or_object.__module__)
-        paths.append((name, module.__file__))
+    code = getattr(path_or_object, "__code__", None)
+    if code is not None:
+        paths.append((name, code.co_filename))
 
     if not paths:
         raise ValueError(f"Could not find path for {name} {path_or_object} {type(path_or_object)}")
@@ -278,7 +374,8 @@ def git_check(*args) -> dict:
     return result
 
 
-def platform_info():
+@cache
+def _platform_info():
     import platform
 
     r = {}
@@ -300,7 +397,15 @@ def platform_info():
     return r
 
 
+def platform_info():
+    # The platform cannot change during the lifetime of the process
+    return dict(_platform_info())
+
+
 def gpu_info():
+    import json
+    import subprocess
+
     import nvsmi
 
     if not nvsmi.is_nvidia_smi_on_path():
@@ -312,46 +417,79 @@ def gpu_info():
         return e.output.decode("utf-8").strip()
 
 
-def path_md5(path):
+def path_hash(path, algorithm="md5"):
+    """Return the hex digest of the content of a file.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+    algorithm : str, optional
+        The name of a ``hashlib`` algorithm, by default "md5". Algorithms such as
+        "sha256" are hardware-accelerated on most recent CPUs.
+
+    Returns
+    -------
+    str
+        The hex digest.
+    """
     import hashlib
 
-    hash = hashlib.md5()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+        # Python 3.11+ reads the file in C, bypassing the Python loop
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, algorithm).hexdigest()
+
+        hash = hashlib.new(algorithm)
+        for chunk in iter(lambda: f.read(8 * 1024 * 1024), b""):
             hash.update(chunk)
-    return hash.hexdigest()
+        return hash.hexdigest()
 
 
-def assets_info(paths):
-    result = {}
+def path_md5(path):
+    return path_hash(path, "md5")
 
-    for path in paths:
-        try:
-            (mode, ino, dev, nlink, uid, gid, size, atime, mtime, ctime) = os.stat(path)  # noqa: F841
-            md5 = path_md5(path)
-        except Exception as e:
-            result[path] = str(e)
-            continue
 
-        result[path] = dict(
-            size=size,
-            atime=datetime.datetime.fromtimestamp(atime).isoformat(),
-            mtime=datetime.datetime.fromtimestamp(mtime).isoformat(),
-            ctime=datetime.datetime.fromtimestamp(ctime).isoformat(),
-            md5=md5,
-        )
+def _asset_info(path):
+    import datetime
 
-        try:
-            from .checkpoint import peek
+    try:
+        (mode, ino, dev, nlink, uid, gid, size, atime, mtime, ctime) = os.stat(path)  # noqa: F841
+        md5 = path_md5(path)
+    except Exception as e:
+        return str(e)
+
+    result = dict(
+        size=size,
+        atime=datetime.datetime.fromtimestamp(atime).isoformat(),
+        mtime=datetime.datetime.fromtimestamp(mtime).isoformat(),
+        ctime=datetime.datetime.fromtimestamp(ctime).isoformat(),
+        md5=md5,
+    )
 
-            result[path]["peek"] = peek(path)
-        except Exception:
-            pass
+    try:
+        from .checkpoint import peek
+
+        result["peek"] = peek(path)
+    except Exception:
+        pass
 
     return result
 
 
-def gather_provenance_info(assets=[], full=False) -> dict:
+def assets_info(paths):
+    import concurrent.futures
+
+    paths = list(paths)
+    if not paths:
+        return {}
+
+    # hashlib releases the GIL while hashing, so the assets can be processed in threads
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+        return dict(zip(paths, executor.map(_asset_info, paths)))
+
+
+def gather_provenance_info(assets=[], full=False, *, git=True, platform=True, gpus=True) -> dict:
     """Gather information about the current environment
 
     Parameters
@@ -360,35 +498,57 @@ def gather_provenance_info(assets=[], full=False) -> dict:
         A list of file paths for which to collect the MD5 sum, the size and time attributes, by default []
     full : bool, optional
         If true, will also collect various paths, by default False
+    git : bool, optional
+        If false, the git information of the modules is not collected, by default True
+    platform : bool, optional
+        If false, the platform information is not collected when ``full`` is true, by default True
+    gpus : bool, optional
+        If false, ``nvidia-smi`` is not queried when ``full`` is true, by default True
 
     Returns
     -------
     dict
-        A dictionary with the collected information
+        A dictionary with the collected information. The sections that are not collected are left out.
     """
+    import datetime
+
     executable = sys.executable
 
-    versions, git_versions = module_versions(full)
+    versions, paths = _module_versions(full)
+
+    # Naive UTC, as returned by the deprecated datetime.utcnow()
+    time = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
 
     if not full:
-        return dict(
-            time=datetime.datetime.utcnow().isoformat(),
+        result = dict(
+            time=time,
             python=f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
             module_versions=versions,
             distribution_names=import_name_to_distribution_name(versions.keys()),
-            git_versions=git_versions,
-        )
-    else:
-        return dict(
-            time=datetime.datetime.utcnow().isoformat(),
-            executable=executable,
-            args=sys.argv,
-            python_path=sys.path,
-            config_paths=sysconfig.get_paths(),
-            module_versions=versions,
-            distribution_names=import_name_to_distribution_name(versions.keys()),
-            git_versions=git_versions,
-            platform=platform_info(),
-            gpus=gpu_info(),
-            assets=assets_info(assets),
         )
+        if git:
+            result["git_versions"] = _check_for_git(paths, full)
+        return result
+
+    result = dict(
+        time=time,
+        executable=executable,
+        args=sys.argv,
+        python_path=sys.path,
+        config_paths=dict(_sysconfig_paths()),
+        module_versions=versions,
+        distribution_names=import_name_to_distribution_name(versions.keys()),
+    )
+
+    if git:
+        result["git_versions"] = _check_for_git(paths, full)
+
+    if platform:
+        result["platform"] = platform_info()
+
+    if gpus:
+        result["gpus"] = gpu_info()
+
+    result["assets"] = assets_info(assets)
+
+    return result
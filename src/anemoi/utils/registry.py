@@ -9,11 +9,12 @@
 
 
 import importlib
+import json
 import logging
 import os
 import sys
-
-import entrypoints
+import threading
+from functools import lru_cache
 
 LOG = logging.getLogger(__name__)
 
@@ -33,6 +34,24 @@ class Wrapper:
 _BY_KIND = {}
 
 
+@lru_cache(maxsize=None)
+def _all_entry_points():
+    # Listing the entry points reads the metadata of every installed distribution,
+    # so do it once for all the groups
+    from importlib import metadata
+
+    # For python 3.9 support
+    if sys.version_info < (3, 10):
+        import importlib_metadata as metadata
+
+    return metadata.entry_points()
+
+
+@lru_cache(maxsize=None)
+def _entry_points(group):
+    return tuple(_all_entry_points().select(group=group))
+
+
 class Registry:
     """A registry of factories"""
 
@@ -42,6 +61,13 @@ class Registry:
         self.registered = {}
         self.kind = package.split(".")[-1]
         self.key = key
+        self._scanned = False
+        # Re-entrant, as a module may use the registry while being imported
+        self._scan_lock = threading.RLock()
+        # Which module registered each factory, persisted across processes, see _load_hinted()
+        self._modules = {}
+        self._hints = None
+        self._entrypoint_group = f"anemoi.{self.kind}"
         _BY_KIND[self.kind] = self
 
     @classmethod
@@ -60,43 +86,124 @@ class Registry:
 
     def _load(self, file):
         name, _ = os.path.splitext(file)
+
+        # Already imported, so its factories are registered
+        if f"{self.package}.{name}" in sys.modules:
+            return
+
+        before = set(self.registered)
         try:
             importlib.import_module(f".{name}", package=self.package)
         except Exception:
             LOG.warning(f"Error loading filter '{self.package}.{name}'", exc_info=True)
 
+        for registered in self.registered.keys() - before:
+            self._modules[registered] = name
+
+    def _hints_path(self):
+        # Same location as caching._get_cache_path("registry"), without importing numpy
+        return os.path.join(os.path.expanduser("~"), ".cache", "anemoi", "registry", f"{self.package}.json")
+
+    def _hints_stamp(self):
+        directory = self._directory()
+        return [directory, os.stat(directory).st_mtime]
+
+    def _load_hinted(self, name):
+        # The hints are only used to pick a module to import first: if they are out of date,
+        # the name is not registered by that module and the package is scanned as usual
+        if self._hints is None:
+            self._hints = {}
+            try:
+                with open(self._hints_path()) as f:
+                    hints = json.load(f)
+                if hints["stamp"] == self._hints_stamp():
+                    self._hints = hints["modules"]
+            except Exception:
+                # Missing, unreadable or stale hints
+                pass
+
+        module = self._hints.get(name)
+        if module is not None:
+            self._load(module)
+
+    def _save_hints(self):
+        path = self._hints_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.{os.getpid()}.tmp"
+            with open(temp, "w") as f:
+                json.dump(dict(stamp=self._hints_stamp(), modules=self._modules), f)
+            os.replace(temp, path)
+        except OSError as e:
+            LOG.debug(f"Cannot save registry hints in {path}: {e}")
+
+    def _directory(self):
+        return sys.modules[self.package].__path__[0]
+
+    def _load_named(self, name):
+        # Factories usually live in a module named after them, so try that module before importing the whole package
+        module = name.replace("-", "_")
+        if not module.isidentifier():
+            return
+
+        directory = self._directory()
+        if os.path.exists(os.path.join(directory, f"{module}.py")) or os.path.exists(
+            os.path.join(directory, module, "__init__.py")
+        ):
+            self._load(module)
+
+    def _ensure_scanned(self):
+        # Import every module of the package once, so that they can register their factories
+        if self._scanned:
+            return
+
+        with self._scan_lock:
+            if not self._scanned:
+                self._scan()
+                self._save_hints()
+                self._scanned = True
+
+    def _scan(self):
+        directory = self._directory()
+
+        # scandir() gets the file type from the directory listing, saving a stat() per entry
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                file = entry.name
+
+                if file[0] == ".":
+                    continue
+
+                if file == "__init__.py":
+                    continue
+
+                if entry.is_dir():
+                    if os.path.exists(os.path.join(entry.path, "__init__.py")):
+                        self._load(file)
+                    continue
+
+                if file.endswith(".py"):
+                    self._load(file)
+
     def lookup(self, name: str, *, return_none=False) -> callable:
 
         # print('✅✅✅✅✅✅✅✅✅✅✅✅✅', name, self.registered)
         if name in self.registered:
             return self.registered[name]
 
-        directory = sys.modules[self.package].__path__[0]
-
-        for file in os.listdir(directory):
+        if not self._scanned:
+            self._load_named(name)
 
-            if file[0] == ".":
-                continue
+            if name not in self.registered:
+                self._load_hinted(name)
 
-            if file == "__init__.py":
-                continue
-
-            full = os.path.join(directory, file)
-            if os.path.isdir(full):
-                if os.path.exists(os.path.join(full, "__init__.py")):
-                    self._load(file)
-                continue
-
-            if file.endswith(".py"):
-                self._load(file)
+        if name not in self.registered:
+            self._ensure_scanned()
 
-        entrypoint_group = f"anemoi.{self.kind}"
-        for entry_point in entrypoints.get_group_all(entrypoint_group):
+        for entry_point in _entry_points(self._entrypoint_group):
             if entry_point.name == name:
                 if name in self.registered:
-                    LOG.warning(
-                        f"Overwriting builtin '{name}' from {self.package} with plugin '{entry_point.module_name}'"
-                    )
+                    LOG.warning(f"Overwriting builtin '{name}' from {self.package} with plugin '{entry_point.module}'")
                 self.registered[name] = entry_point.load()
 
         if name not in self.registered:
@@ -125,13 +232,11 @@ class Registry:
             raise ValueError(f"Invalid config: {config}")
 
         if self.key in config:
-            config = config.copy()
-            key = config.pop(self.key)
-            return self.create(key, *args, **config, **kwargs)
+            key = config[self.key]
+            return self.create(key, *args, **{k: v for k, v in config.items() if k != self.key}, **kwargs)
 
         if len(config) == 1:
-            key = list(config.keys())[0]
-            value = config[key]
+            ((key, value),) = config.items()
 
             if isinstance(value, dict):
                 return self.create(key, *args, **value, **kwargs)
@@ -11,6 +11,7 @@
 import datetime
 from textwrap import dedent
 
+import numpy as np
 import yaml
 
 from anemoi.utils.dates import datetimes_factory
@@ -83,6 +84,24 @@ def test_date_hindcast_1():
     assert len(list(d)) == 60
 
 
+def test_date_hindcast_as_array():
+    d = _(
+        """
+        - name: hindcast
+          reference_dates:
+            - 2024-02-29T06:00:00
+            - 2023-01-01
+          years: 5
+    """
+    )
+    dates, references = d.as_array()
+    expected = list(d)
+    assert len(dates) == len(references) == len(expected) == 10
+    for (date, reference), a, b in zip(expected, dates, references):
+        assert a == np.datetime64(date, "s")
+        assert b == np.datetime64(reference, "s")
+
+
 if __name__ == "__main__":
     for name, obj in list(globals().items()):
         if name.startswith("test_") and callable(obj):
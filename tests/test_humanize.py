@@ -0,0 +1,115 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import datetime
+
+import pytest
+
+from anemoi.utils.humanize import base2_to_human
+from anemoi.utils.humanize import bytes_to_human
+from anemoi.utils.humanize import compress_dates
+from anemoi.utils.humanize import did_you_mean
+from anemoi.utils.humanize import human_seconds
+from anemoi.utils.humanize import human_to_bytes
+from anemoi.utils.humanize import human_to_timedelta
+from anemoi.utils.humanize import json_pretty_dump
+from anemoi.utils.humanize import make_list_int
+from anemoi.utils.humanize import make_range_int
+from anemoi.utils.humanize import shorten_list
+from anemoi.utils.humanize import string_distance
+
+
+def test_bytes_to_human():
+    assert bytes_to_human(4096) == "4 KiB"
+    assert bytes_to_human(4000) == "3.9 KiB"
+    # Ties are rounded up
+    assert bytes_to_human(3.25 * 1024) == "3.3 KiB"
+    assert bytes_to_human(0.25) == "0.3"
+    assert base2_to_human(3.25 * 1024) == "3.3K"
+
+
+def test_human_to_number():
+    assert human_seconds("2h") == 7200
+    assert human_seconds(None, none_ok=True) is None
+    assert human_to_bytes("1K") == 1024
+
+    # Unhashable values are rejected like any other invalid value
+    with pytest.raises(ValueError):
+        human_to_bytes(["1K"])
+
+
+def test_compress_dates():
+    dates = [datetime.datetime(2020, 1, d) for d in (1, 2, 3, 4, 7, 9, 11, 12)]
+    assert compress_dates(dates) == [
+        "2020-01-01 00:00:00 to 2020-01-04 00:00:00 by 1 day, 0:00:00",
+        "2020-01-07 00:00:00 to 2020-01-11 00:00:00 by 2 days, 0:00:00",
+        "2020-01-12 00:00:00",
+    ]
+
+    dates = [datetime.datetime(2020, 1, d) for d in (1, 2, 3, 4, 7)]
+    assert compress_dates(dates) == [
+        "2020-01-01 00:00:00 to 2020-01-04 00:00:00 by 1 day, 0:00:00",
+        "2020-01-07 00:00:00",
+    ]
+
+
+def test_human_to_timedelta():
+    assert human_to_timedelta("1w2d3h") == datetime.timedelta(weeks=1, days=2, hours=3)
+    assert human_to_timedelta("1 hour 30 minutes") == datetime.timedelta(hours=1, minutes=30)
+    assert human_to_timedelta("10s") == datetime.timedelta(seconds=10)
+    assert human_to_timedelta(None, none_ok=True) is None
+
+    for value in ("12", "1h2", "h", "1y"):
+        with pytest.raises(ValueError):
+            human_to_timedelta(value)
+
+
+def test_json_pretty_dump():
+    obj = {"a": [1, 2, 3], "b": {"c": "d"}}
+    assert json_pretty_dump(obj) == '{"a": [1, 2, 3], "b": {"c": "d"}}'
+    assert json_pretty_dump(obj, max_line_length=20) == ("{\n" '    "a": [1, 2, 3],\n' '    "b": {"c": "d"}\n' "}")
+
+
+def test_shorten_list():
+    assert shorten_list([1, 2, 3]) == [1, 2, 3]
+    assert shorten_list(list(range(100))) == [0, 1, "...", 98, 99]
+    assert shorten_list(tuple(range(100))) == (0, 1, "...", 98, 99)
+    assert shorten_list(list(range(100)), max_length=1) == ["..."]
+
+
+def test_string_distance():
+    assert string_distance("kitten", "sitting") == 3
+    assert string_distance("", "abc") == 3
+    assert string_distance("abc", "") == 3
+    assert string_distance("same", "same") == 0
+    assert string_distance("a" * 100, "a" * 98 + "bc") == 2
+    assert string_distance("kitten", "sitting", max_distance=1) == 2
+    assert string_distance("kitten", "sitting", max_distance=3) == 3
+    assert did_you_mean("aple", ["banana", "lemon", "apple", "orange"]) == "apple"
+    assert did_you_mean("ab", ["cb", "ad", "abcdef"]) == "ad"
+
+
+def test_make_list_int():
+    assert make_list_int("3") == [3]
+    assert make_list_int("1/2/3") == [1, 2, 3]
+    assert make_list_int("1/to/3") == [1, 2, 3]
+    assert make_list_int("1/to/10/by/3") == [1, 4, 7, 10]
+    assert make_list_int(5) == [5]
+    assert make_range_int("1/TO/10/BY/2") == range(1, 12, 2)
+
+    with pytest.raises(ValueError):
+        make_range_int("1/2/3")
+
+
+if __name__ == "__main__":
+    for name, obj in list(globals().items()):
+        if name.startswith("test_") and callable(obj):
+            print(f"Running {name}...")
+            obj()
@@ -0,0 +1,82 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import sys
+import threading
+
+from anemoi.utils.logs import LoggingNameFilter
+from anemoi.utils.logs import ThreadCustomFormatter
+from anemoi.utils.logs import set_logging_name
+
+
+def _format(formatter, msg):
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, msg, None, None)
+    return formatter.format(record)
+
+
+def test_logging_name():
+    formatter = ThreadCustomFormatter("%(logging_name)s - %(message)s")
+
+    set_logging_name("main-thread")
+    assert _format(formatter, "hello") == "main-thread - hello"
+
+    result = {}
+
+    def worker():
+        result["default"] = _format(formatter, "hello")
+        set_logging_name("worker")
+        result["named"] = _format(formatter, "hello")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert result["default"] == "main - hello"
+    assert result["named"] == "worker - hello"
+    assert _format(formatter, "hello") == "main-thread - hello"
+
+
+def test_logging_name_formatter():
+    formatter = ThreadCustomFormatter("%(asctime)s - %(logging_name)s - %(message)s", datefmt="%Y")
+    set_logging_name("fmt")
+
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, "hello %s", ("world",), None)
+    assert formatter.format(record).endswith(" - fmt - hello world")
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("test", logging.ERROR, __file__, 0, "failed", None, sys.exc_info())
+
+    text = formatter.format(record)
+    assert " - fmt - failed\n" in text
+    assert "ValueError: boom" in text
+
+    class CustomFormatter(ThreadCustomFormatter):
+        def formatMessage(self, record):
+            return "CUSTOM"
+
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, "hi", None, None)
+    assert CustomFormatter("%(message)s").format(record) == "CUSTOM"
+
+
+def test_logging_name_filter():
+    set_logging_name("filtered")
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, "hello", None, None)
+    assert LoggingNameFilter().filter(record)
+    assert logging.Formatter("%(logging_name)s - %(message)s").format(record) == "filtered - hello"
+
+
+if __name__ == "__main__":
+    for name, obj in list(globals().items()):
+        if name.startswith("test_") and callable(obj):
+            print(f"Running {name}...")
+            obj()
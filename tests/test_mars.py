@@ -0,0 +1,25 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+from anemoi.utils.mars import _lookup_mars_stream
+
+
+def test_lookup_mars_stream():
+    assert _lookup_mars_stream({"stream": "elda"}) == {"runs": [6, 18]}
+    assert _lookup_mars_stream({"class": "od", "stream": "elda", "param": "2t"}) == {"runs": [6, 18]}
+    assert _lookup_mars_stream({"stream": "oper"}) is None
+    assert _lookup_mars_stream({"class": "ea", "stream": "elda"}) is None
+
+
+if __name__ == "__main__":
+    for name, obj in list(globals().items()):
+        if name.startswith("test_") and callable(obj):
+            print(f"Running {name}...")
+            obj()
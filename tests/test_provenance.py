@@ -8,9 +8,90 @@
 # nor does it submit to any jurisdiction.
 
 
+import hashlib
+import os
+
+import pytest
+
 from anemoi.utils import provenance
 
 
 def test_gather():
     """Test success of gather_provenance_info"""
     provenance.gather_provenance_info()
+
+
+def test_lookup_git_repo():
+    """Test that lookup_git_repo finds the repository of a module from any of its sub-directories"""
+    repo = provenance.lookup_git_repo(provenance.__file__)
+    if repo is None:
+        # Not running from a git checkout
+        return
+
+    root = repo.working_tree_dir
+    assert provenance.lookup_git_repo(os.path.dirname(provenance.__file__)).working_tree_dir == root
+    assert provenance.lookup_git_repo(root).working_tree_dir == root
+
+
+def test_git_check():
+    """Test that git_check reports modified and untracked files as lists"""
+    if provenance.lookup_git_repo(provenance.__file__) is None:
+        # Not running from a git checkout
+        return
+
+    info = provenance.git_check(provenance)["anemoi.utils.provenance"]
+    assert isinstance(info["sha1"], str)
+    assert isinstance(info["modified_files"], list)
+    assert isinstance(info["untracked_files"], list)
+
+
+def test_path_hash():
+    """Test that path_hash matches hashlib on the whole content of a file"""
+    with open(provenance.__file__, "rb") as f:
+        data = f.read()
+
+    assert provenance.path_md5(provenance.__file__) == hashlib.md5(data).hexdigest()
+    assert provenance.path_hash(provenance.__file__, "sha256") == hashlib.sha256(data).hexdigest()
+
+
+def test_gather_without_git():
+    """Test that gather_provenance_info leaves out the sections that are disabled"""
+    info = provenance.gather_provenance_info(full=True, git=False, platform=False, gpus=False)
+    assert "module_versions" in info
+    assert "git_versions" not in info
+    assert "platform" not in info
+    assert "gpus" not in info
+
+
+def test_git_status(tmp_path):
+    """Test that _git_status matches index.diff(None) and untracked_files, including renames"""
+    git = pytest.importorskip("git")
+
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+
+    for name in ("modified", "deleted", "staged", "renamed", "with space"):
+        (tmp_path / name).write_text(f"{name}\n" * 20)
+    repo.git.add(".")
+    repo.git.commit("-m", "initial")
+
+    (tmp_path / "modified").write_text("changed\n")
+    (tmp_path / "deleted").unlink()
+    (tmp_path / "with space").write_text("changed\n")
+
+    # Renamed in the index, then modified in the worktree
+    repo.git.mv("staged", "staged-new")
+    (tmp_path / "staged-new").write_text("changed\n")
+
+    # Renamed in the worktree only
+    (tmp_path / "renamed").rename(tmp_path / "renamed-new")
+    repo.git.add("-N", "renamed-new")
+
+    (tmp_path / "untracked").write_text("new\n")
+
+    modified, untracked = provenance._git_status(repo)
+    assert sorted(modified) == sorted(item.a_path for item in repo.index.diff(None))
+    assert sorted(untracked) == sorted(repo.untracked_files)
+    assert "renamed" in modified
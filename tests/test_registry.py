@@ -0,0 +1,128 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import importlib
+import os
+import sys
+
+import pytest
+
+INIT = """
+from anemoi.utils.registry import Registry
+
+registry = Registry(__name__)
+"""
+
+FOO = """
+from . import registry
+
+@registry.register("foo")
+class Foo:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+registry.register("baz", Foo)
+"""
+
+BAR = """
+from .. import registry
+
+registry.register("bar", lambda *args, **kwargs: ("bar", args, kwargs))
+"""
+
+
+def _unload(name):
+    for module in [m for m in sys.modules if m == name or m.startswith(f"{name}.")]:
+        del sys.modules[module]
+
+
+@pytest.fixture
+def make_package(tmp_path, monkeypatch):
+    """Create packages with a module and a sub-package that register factories, and import them.
+
+    The registry hints are written in a temporary home directory, and the packages are unloaded afterwards.
+    """
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = []
+
+    def make(name):
+        (tmp_path / name / "bar").mkdir(parents=True)
+        (tmp_path / name / "__init__.py").write_text(INIT)
+        (tmp_path / name / "foo.py").write_text(FOO)
+        (tmp_path / name / "bar" / "__init__.py").write_text(BAR)
+
+        names.append(name)
+        return importlib.import_module(name).registry
+
+    yield make
+
+    for name in names:
+        _unload(name)
+
+
+def test_registry_lookup(make_package):
+    registry = make_package("_test_registry_lookup")
+
+    assert registry.lookup("unknown", return_none=True) is None
+    assert registry._scanned
+
+    foo = registry.create("foo", 1, a=2)
+    assert foo.args == (1,) and foo.kwargs == {"a": 2}
+
+    assert registry.lookup("bar")(1) == ("bar", (1,), {})
+
+
+def test_registry_lookup_named_module(make_package):
+    registry = make_package("_test_registry_lookup_named_module")
+
+    # Only the module named after the factory is imported
+    assert registry.lookup("foo").__name__ == "Foo"
+    assert not registry._scanned
+    assert "_test_registry_lookup_named_module.bar" not in sys.modules
+
+    assert registry.lookup("bar")(1) == ("bar", (1,), {})
+
+
+def test_registry_lookup_hints(make_package):
+    name = "_test_registry_lookup_hints"
+    registry = make_package(name)
+
+    # Scanning the package records which module registers each factory
+    assert registry.lookup("unknown", return_none=True) is None
+    assert registry._scanned
+
+    assert os.path.exists(os.path.expanduser(f"~/.cache/anemoi/registry/{name}.json"))
+
+    # Simulate a new process
+    _unload(name)
+    registry = importlib.import_module(name).registry
+
+    # "baz" is registered by foo.py, which is found without scanning the package
+    assert registry.lookup("baz").__name__ == "Foo"
+    assert not registry._scanned
+    assert f"{name}.bar" not in sys.modules
+
+
+def test_registry_from_config(make_package):
+    registry = make_package("_test_registry_from_config")
+
+    assert registry.from_config("bar") == ("bar", (), {})
+    assert registry.from_config({"bar": {"a": 1}}) == ("bar", (), {"a": 1})
+    assert registry.from_config({"bar": [1, 2]}) == ("bar", (1, 2), {})
+    assert registry.from_config({"bar": 1}) == ("bar", (1,), {})
+    assert registry.from_config({"_type": "bar", "a": 1}) == ("bar", (), {"a": 1})
+
+
+if __name__ == "__main__":
+    # The tests use pytest fixtures
+    pytest.main([__file__])